@@ -1,70 +1,209 @@
-import ast, json, argparse
+import ast, io, json, argparse, functools, keyword, os, re
+from collections import OrderedDict
+from itertools import chain, product
 from dataclasses import dataclass
 from typing import Dict, List, Set, Tuple, Optional
 
-@dataclass
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+_MERMAID_HEADER = (
+    "%%{init: {'flowchart': {'rankSpacing': 25, 'nodeSpacing': 50, 'padding': 5}}}%%\n"
+    "flowchart TD\n"
+    'Start["Start"]\n'
+)
+_MERMAID_FOOTER = (
+    "classDef default fill:#f0f0f0,stroke:#333,stroke-width:1px,color:black\n"
+    "classDef start fill:#FFA500,stroke:#333,color:white\n"
+    "classDef approval fill:#4CAF50,stroke:#333,color:white\n"
+    "classDef rejection fill:#DC143C,stroke:#333,color:white\n"
+    "class Start start\n"
+    "class Approve approval\n"
+    "class Deny rejection\n"
+    "linkStyle default stroke:#333,stroke-width:2px"
+)
+
+# Prebound format templates: skips re-executing f-string FORMAT_VALUE bytecode
+# for every node/edge line in the emission loops
+_NODE_FMT = '{}["{}"]\n'.format
+_EDGE_FMT = '{} -->|{}| {}\n'.format
+_START_FMT = 'Start --> {}\n'.format
+
+_CACHE_SIZE = int(os.environ.get('FLOWCHART_CACHE', 4096))
+_graph_cache: 'OrderedDict[Tuple, str]' = OrderedDict()
+
+@functools.lru_cache(maxsize=4096)
+def _parse_logic(logic: str) -> ast.expr:
+    return ast.parse(logic, mode='eval').body
+
+# Numeric node tags checked via int compare on the hot traversal paths;
+# isinstance with ast's ABC machinery costs several times more per test
+_TAG_NAME, _TAG_BOOLOP, _TAG_UNARYOP = 0, 1, 2
+_TAG = {ast.Name: _TAG_NAME, ast.BoolOp: _TAG_BOOLOP, ast.UnaryOp: _TAG_UNARYOP}
+
+@dataclass(frozen=True, slots=True)
 class Literal:
     name: str
     is_positive: bool = True
 
-class NegationNormalizer:
-    def __init__(self):
-        self.negated_nodes = set()
-        
-    def normalize(self, node: ast.expr) -> ast.expr:
-        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
-            if isinstance(node.operand, ast.Name):
-                self.negated_nodes.add(node.operand.id)
-                return node.operand
-            elif isinstance(node.operand, ast.BoolOp):
-                new_op = ast.Or() if isinstance(node.operand.op, ast.And) else ast.And()
-                node.operand.op = new_op
-                node.operand.values = [ast.UnaryOp(op=ast.Not(), operand=val) for val in node.operand.values]
-                return self.normalize(node.operand)
-        elif isinstance(node, ast.BoolOp):
-            node.values = [self.normalize(value) for value in node.values]
-        return node
+# Interned Literal instances: the same (name, polarity) pair appears in many
+# terms, so share one frozen object per pair instead of allocating each time
+_POS: Dict[str, Literal] = {}
+_NEG: Dict[str, Literal] = {}
+
+def literal(name: str, is_positive: bool = True) -> Literal:
+    cache = _POS if is_positive else _NEG
+    lit = cache.get(name)
+    if lit is None:
+        lit = cache[name] = Literal(name, is_positive)
+    return lit
+
+def to_nnf(node: ast.expr, negate: bool = False) -> ast.expr:
+    # Push negations down to the leaves (De Morgan plus double-negation
+    # elimination) so only Name and not-Name leaves remain below and/or.
+    # Builds new nodes, so cached ASTs from _parse_logic can be shared.
+    if type(node) is ast.UnaryOp and type(node.op) is ast.Not:
+        return to_nnf(node.operand, not negate)
+    if type(node) is ast.BoolOp:
+        if negate:
+            new_op = ast.Or() if type(node.op) is ast.And else ast.And()
+        else:
+            new_op = node.op
+        return ast.BoolOp(op=new_op, values=[to_nnf(value, negate) for value in node.values])
+    return ast.UnaryOp(op=ast.Not(), operand=node) if negate else node
 
 class DNFConverter:
-    def convert(self, node: ast.expr) -> List[List[Literal]]:
-        if isinstance(node, ast.Name):
-            return [[Literal(node.id)]]
-        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
-            if isinstance(node.operand, ast.Name):
-                return [[Literal(node.operand.id, False)]]
-            inner_dnf = self.convert(node.operand)
-            return self._negate_dnf(inner_dnf)
-        if isinstance(node, ast.BoolOp):
-            if isinstance(node.op, ast.And):
-                result = [[]]
-                for value in node.values:
-                    terms = self.convert(value)
-                    result = self._distribute_and(result, terms)
-                return result
-            if isinstance(node.op, ast.Or):
-                result = []
-                for value in node.values:
-                    result.extend(self.convert(value))
-                return result
-        return []
-        
-    def _negate_dnf(self, terms: List[List[Literal]]) -> List[List[Literal]]:
+    # Internally a literal is a plain int: variable index for positive, its
+    # two's complement (~index) for negative, so negation is just ~ and terms
+    # are cheap hashable int tuples. Literal objects exist only at the boundary.
+    def __init__(self):
+        self._name_to_id: Dict[str, int] = {}
+        self._names: List[str] = []
+
+    def convert(self, node: ast.expr) -> List[Tuple[Literal, ...]]:
+        # One walk both tags every node for int dispatch and interns the names
+        name_to_id = self._name_to_id
+        for sub in ast.walk(node):
+            sub._k = _TAG.get(type(sub), -1)
+            if sub._k == _TAG_NAME and sub.id not in name_to_id:
+                name_to_id[sub.id] = len(self._names)
+                self._names.append(sub.id)
+        terms = self._simplify(self._convert(node))
+        names = self._names
+        return [tuple(literal(names[lit]) if lit >= 0 else literal(names[~lit], False) for lit in term)
+                for term in terms]
+
+    _ENTER, _EXIT = 0, 1
+
+    def _convert(self, node: ast.expr) -> List[Tuple[int, ...]]:
+        # Explicit-stack post-order traversal: no Python call frames on the hot
+        # path and no RecursionError on deeply nested formulas. Each EXIT pops
+        # its children's DNFs off the result stack and combines them.
+        work = [(node, self._ENTER)]
+        results: List[List[Tuple[int, ...]]] = []
+        while work:
+            node, state = work.pop()
+            if state == self._ENTER:
+                kind = node._k
+                if kind == _TAG_NAME:
+                    results.append([(self._name_to_id[node.id],)])
+                elif kind == _TAG_UNARYOP and type(node.op) is ast.Not:
+                    if node.operand._k == _TAG_NAME:
+                        results.append([(~self._name_to_id[node.operand.id],)])
+                    else:
+                        work.append((node, self._EXIT))
+                        work.append((node.operand, self._ENTER))
+                elif kind == _TAG_BOOLOP:
+                    work.append((node, self._EXIT))
+                    for value in reversed(node.values):
+                        work.append((value, self._ENTER))
+                else:
+                    results.append([])
+            elif node._k == _TAG_UNARYOP:
+                results.append(self._negate_dnf(results.pop()))
+            else:
+                children = results[len(results) - len(node.values):]
+                del results[len(results) - len(node.values):]
+                if type(node.op) is ast.And:
+                    results.append(functools.reduce(self._distribute_and, children, [()]))
+                else:
+                    results.append(list(chain.from_iterable(children)))
+        return results.pop()
+
+    def _simplify(self, terms: List[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
+        # DMCF-style reduction: drop contradictory terms (x and not x), duplicate
+        # literals/terms, and terms absorbed by a strict subset of their literals
+        unique = []
+        seen_keys = set()
+        for term in terms:
+            lits = []
+            lit_set = set()
+            contradictory = False
+            for lit in term:
+                if ~lit in lit_set:
+                    contradictory = True
+                    break
+                if lit not in lit_set:
+                    lit_set.add(lit)
+                    lits.append(lit)
+            if contradictory:
+                continue
+            key = frozenset(lit_set)
+            if key not in seen_keys:
+                seen_keys.add(key)
+                unique.append((tuple(lits), key))
+        minimal_keys = self._minimal_keys(unique)
+        return [term for term, key in unique if key in minimal_keys]
+
+    def _minimal_keys(self, unique: List[Tuple[Tuple[int, ...], frozenset]]) -> Set[frozenset]:
+        # Absorption: keep only terms with no strict subset among the others
+        ordered = sorted(unique, key=lambda item: len(item[1]))
+        if np is not None and 8 < len(self._names) <= 64 and len(ordered) > 1:
+            # Terms as (positive, negative) bitmasks: T' absorbs T iff both masks
+            # of T' are submasks of T's, checked vectorized across all kept terms
+            k = len(ordered)
+            pos = np.zeros(k, dtype=np.uint64)
+            neg = np.zeros(k, dtype=np.uint64)
+            for i, (_, key) in enumerate(ordered):
+                p = n = 0
+                for lit in key:
+                    if lit >= 0:
+                        p |= 1 << lit
+                    else:
+                        n |= 1 << ~lit
+                pos[i] = p
+                neg[i] = n
+            kept = np.zeros(k, dtype=bool)
+            kept[0] = True
+            minimal = [ordered[0][1]]
+            for i in range(1, k):
+                absorbed = ((pos[:i] & pos[i]) == pos[:i]) & ((neg[:i] & neg[i]) == neg[:i]) & kept[:i]
+                if not absorbed.any():
+                    kept[i] = True
+                    minimal.append(ordered[i][1])
+            return set(minimal)
+        minimal = []
+        for _, key in ordered:
+            if not any(kept <= key for kept in minimal):
+                minimal.append(key)
+        return set(minimal)
+
+    def _negate_dnf(self, terms: List[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
         if not terms:
             return []
         negated_terms = []
         for term in terms:
-            result = [[Literal(term[0].name, not term[0].is_positive)]]
+            result = [(~term[0],)]
             for lit in term[1:]:
-                result = self._distribute_and(result, [[Literal(lit.name, not lit.is_positive)]])
+                result = self._distribute_and(result, [(~lit,)])
             negated_terms.extend(result)
         return negated_terms
-        
-    def _distribute_and(self, terms1: List[List[Literal]], terms2: List[List[Literal]]) -> List[List[Literal]]:
-        result = []
-        for t1 in terms1:
-            for t2 in terms2:
-                result.append(t1 + t2)
-        return result
+
+    def _distribute_and(self, terms1: List[Tuple[int, ...]], terms2: List[Tuple[int, ...]]) -> List[Tuple[int, ...]]:
+        # chain/product run the pairing loop in C instead of Python-level list adds
+        return [tuple(chain.from_iterable(pair)) for pair in product(terms1, terms2)]
 
 class LogicPreprocessor:
     def __init__(self):
@@ -76,121 +215,142 @@ class LogicPreprocessor:
         self.next_id += 1
         return id
         
-    def find_or_groups(self, node, depth=0):
-        if depth >= 4:
-            return []
-        if not isinstance(node, ast.BoolOp):
-            return []
-        groups = []
-        if isinstance(node.op, ast.And):
-            for i, val in enumerate(node.values):
-                if isinstance(val, ast.BoolOp) and isinstance(val.op, ast.Or):
-                    or_terms = []
-                    for or_val in val.values:
-                        if isinstance(or_val, ast.Name):
-                            or_terms.append(or_val.id)
-                        elif isinstance(or_val, ast.UnaryOp) and isinstance(or_val.operand, ast.Name):
-                            or_terms.append(or_val.operand.id)
-                    if or_terms:
-                        remaining_terms = node.values[:i] + node.values[i+1:]
-                        groups.append((or_terms, remaining_terms))
-                groups.extend(self.find_or_groups(val, depth + 1))
-        return groups
-        
+    def _substitute(self, node, depth=0):
+        # Replace OR groups of plain names under an AND with virtual nodes,
+        # building new BoolOps rather than mutating the (cached) input tree.
+        # Only AND chains are descended, to a depth of 4, and substituted
+        # virtual nodes are hoisted to the front so the group is asked first.
+        if depth >= 4 or not (type(node) is ast.BoolOp and type(node.op) is ast.And):
+            return node
+        virtual, others = [], []
+        for val in node.values:
+            if (type(val) is ast.BoolOp and type(val.op) is ast.Or
+                    and all(type(or_val) is ast.Name for or_val in val.values)):
+                virtual_node = self.get_next_id()
+                self.split_map[virtual_node] = [or_val.id for or_val in val.values]
+                virtual.append(ast.Name(id=virtual_node, ctx=ast.Load()))
+            else:
+                others.append(self._substitute(val, depth + 1))
+        if not virtual and all(new is old for new, old in zip(others, node.values)):
+            return node
+        return ast.BoolOp(op=ast.And(), values=virtual + others)
+
     def preprocess(self, data):
         logic = data.get('logic', '')
-        questions = {k: v for k, v in data.items() if k != 'logic'}
-        try:
-            parts = logic.split(' and ')
-            or_parts = [p for p in parts if ' or ' in p]
-            other_parts = [p for p in parts if ' or ' not in p]
-            logic = ' and '.join(or_parts + other_parts)
-            node = ast.parse(logic, mode='eval').body
-            or_groups = self.find_or_groups(node)
-            if not or_groups:
-                return data, {}
-            new_questions = questions.copy()
-            new_logic = logic
-            for or_terms, _ in or_groups:
-                virtual_node = self.get_next_id()
-                self.split_map[virtual_node] = or_terms
-                or_desc = " OR ".join(questions[t] for t in or_terms if t in questions)
-                new_questions[virtual_node] = f"Does patient meet either:\n{or_desc}?"
-                old_part = "(" + " or ".join(or_terms) + ")"
-                new_logic = new_logic.replace(old_part, virtual_node)
-            return {**new_questions, 'logic': new_logic}, self.split_map
-        except:
-            return data, {}
+        questions = {**data}  # one C-level copy instead of a filtering comprehension
+        questions.pop('logic', None)
+        node = self._substitute(_parse_logic(logic))
+        for virtual_node, or_terms in self.split_map.items():
+            or_desc = " OR ".join(questions[t] for t in or_terms if t in questions)
+            questions[virtual_node] = f"Does patient meet either:\n{or_desc}?"
+        return node, questions, self.split_map
 
 class GraphBuilder:
-    def __init__(self, questions: Dict[str, str], split_map: Dict[str, List[str]] = None, negated_nodes: Set[str] = None):
+    def __init__(self, questions: Dict[str, str], split_map: Dict[str, List[str]] = None):
         self.questions = questions
-        self.nodes = set()
-        self.edges = set()
+        self.nodes: Dict[str, str] = {}  # full node name -> base question name
+        self.out_edges: Dict[str, Dict[str, str]] = {}
         self.node_count = {}
         self.split_map = split_map or {}
-        self.negated_nodes = negated_nodes or set()
-        
-    def build_mermaid(self, terms: List[List[Literal]]) -> str:
-        lines = [
-            "%%{init: {'flowchart': {'rankSpacing': 25, 'nodeSpacing': 50, 'padding': 5}}}%%",
-            "flowchart TD"
-        ]
-        lines.append('Start["Start"]')
-        start_questions = set(term[0].name for term in terms)
+        self.start_nodes: List[str] = []
+        self.edge_conflicts: List[Tuple[str, str, str]] = []
+
+    def build_mermaid(self, terms: List[Tuple[Literal, ...]]) -> str:
+        self._populate_terms(terms)
+        return self._emit_mermaid()
+
+    def build_mermaid_from_ast(self, node: ast.expr) -> str:
+        self._populate_ast(node)
+        return self._emit_mermaid()
+
+    def build_dag(self, terms: List[Tuple[Literal, ...]]) -> Dict:
+        self._populate_terms(terms)
+        return self._emit_dag()
+
+    def build_dag_from_ast(self, node: ast.expr) -> Dict:
+        self._populate_ast(node)
+        return self._emit_dag()
+
+    def _populate_terms(self, terms: List[Tuple[Literal, ...]]) -> None:
+        # dict.fromkeys dedups while keeping first-term order, so start edges
+        # come out in term order rather than set hash order
+        self.start_nodes = list(dict.fromkeys(term[0].name for term in terms))
         for term in terms:
             self._add_term(term)
-        for node in self.nodes:
-            base_name = node.split('_')[0]
-            lines.append(f'{node}["{self.questions.get(base_name, base_name)}"]')
-        lines.append('Approve["Yes"]')
-        lines.append('Deny["No"]')
-        
-        for start_q in start_questions:
+
+    def _populate_ast(self, node: ast.expr) -> None:
+        self.start_nodes = [self._emit_direct(node, "Approve", "Deny")]
+
+    def _emit_direct(self, node: ast.expr, yes_target: str, no_target: str) -> str:
+        # Direct emission for tree-shaped logic (every variable asked once):
+        # builds targets right-to-left so each subformula knows where Yes/No
+        # continue, sharing Approve/Deny/sibling entry nodes across OR branches
+        if type(node) is ast.UnaryOp and type(node.op) is ast.Not:
+            return self._emit_direct(node.operand, no_target, yes_target)
+        if type(node) is ast.Name:
+            name = node.id
+            self.nodes[name] = name
+            self._add_edge(name, "Yes", yes_target)
+            self._add_edge(name, "No", no_target)
+            return name
+        if type(node.op) is ast.And:
+            entry = yes_target
+            for value in reversed(node.values):
+                entry = self._emit_direct(value, entry, no_target)
+        else:
+            entry = no_target
+            for value in reversed(node.values):
+                entry = self._emit_direct(value, yes_target, entry)
+        return entry
+
+    def _emit_mermaid(self, decls: Dict[str, str] = None) -> str:
+        buf = io.StringIO()
+        buf.write(_MERMAID_HEADER)
+        get_question = self.questions.get
+        if decls is None:
+            buf.writelines(_NODE_FMT(node, get_question(base_name, base_name))
+                           for node, base_name in self.nodes.items())
+        else:
+            # Schema-precomputed declaration lines; only suffixed duplicates
+            # (Q1_2 etc.) still need formatting here
+            buf.writelines(decls.get(node) or _NODE_FMT(node, get_question(base_name, base_name))
+                           for node, base_name in self.nodes.items())
+        buf.write('Approve["Yes"]\n')
+        buf.write('Deny["No"]\n')
+
+        for start_q in self.start_nodes:
             if start_q in self.split_map:
-                lines.append(f'{start_q}["{self.questions.get(start_q, start_q)}"]')
+                buf.write(_NODE_FMT(start_q, get_question(start_q, start_q)))
                 for q in self.split_map[start_q]:
-                    lines.append(f"Start --> {q}")
-                    lines.append(f'{q}["{self.questions.get(q, q)}"]')
-                    lines.append(f"{q} -->|Yes| {start_q}")
-                    lines.append(f"{q} -->|No| Deny")
+                    buf.write(_START_FMT(q))
+                    buf.write(_NODE_FMT(q, get_question(q, q)))
+                    buf.write(_EDGE_FMT(q, "Yes", start_q))
+                    buf.write(_EDGE_FMT(q, "No", "Deny"))
             else:
-                lines.append(f"Start --> {start_q}")
-                
-        for src, cond, tgt in self.edges:
-            lines.append(f"{src} -->|{cond}| {tgt}")
-            
-        lines.extend([
-            "classDef default fill:#f0f0f0,stroke:#333,stroke-width:1px,color:black",
-            "classDef start fill:#FFA500,stroke:#333,color:white",
-            "classDef approval fill:#4CAF50,stroke:#333,color:white",
-            "classDef rejection fill:#DC143C,stroke:#333,color:white",
-            "class Start start",
-            "class Approve approval",
-            "class Deny rejection",
-            "linkStyle default stroke:#333,stroke-width:2px"
-        ])
-        return "\n".join(lines)
-
-    def build_dag(self, terms: List[List[Literal]]) -> Dict:
+                buf.write(_START_FMT(start_q))
+
+        buf.writelines(_EDGE_FMT(src, cond, tgt)
+                       for src, conds in self.out_edges.items()
+                       for cond, tgt in conds.items())
+
+        buf.write(_MERMAID_FOOTER)
+        return buf.getvalue()
+
+    def _emit_dag(self) -> Dict:
         dag = {"nodes": {}, "edges": {}, "terminal_nodes": {"Approve": "Yes", "Deny": "No"}}
-        start_questions = set(term[0].name for term in terms)
         dag["nodes"]["Start"] = "Decision Point"
-        for node in self.nodes:
-            base_name = node.split('_')[0]
+        for base_name in self.nodes.values():
             dag["nodes"][base_name] = self.questions.get(base_name, base_name)
-        for term in terms:
-            self._add_term(term)
-        dag["edges"]["Start"] = {"Start": list(start_questions)}
-        for src, cond, tgt in self.edges:
-            base_src = src.split('_')[0]
-            base_tgt = tgt.split('_')[0]
+        dag["edges"]["Start"] = {"Start": list(self.start_nodes)}
+        for src, conds in self.out_edges.items():
+            base_src = self.nodes.get(src, src)
             if base_src not in dag["edges"]:
                 dag["edges"][base_src] = {}
-            dag["edges"][base_src][cond] = [base_tgt]
+            for cond, tgt in conds.items():
+                dag["edges"][base_src][cond] = [self.nodes.get(tgt, tgt)]
         return dag
         
-    def _add_term(self, term: List[Literal]) -> None:
+    def _add_term(self, term: Tuple[Literal, ...]) -> None:
         if not term:
             return
         prev_node = None
@@ -205,36 +365,182 @@ class GraphBuilder:
                 self.node_count[curr_node] = 0
                 path_nodes.add(curr_node)
                 
-            self.nodes.add(curr_node)
-            
-            is_negated = curr_node in self.negated_nodes
+            self.nodes[curr_node] = lit.name
+
             if prev_node:
-                yes_target = curr_node if (is_prev_positive != is_negated) else "Deny"
-                no_target = "Deny" if (is_prev_positive != is_negated) else curr_node
-                self.edges.add((prev_node, "Yes", yes_target))
-                self.edges.add((prev_node, "No", no_target))
-                
+                # A positive previous literal continues on Yes, a negative one on No
+                yes_target = curr_node if is_prev_positive else "Deny"
+                no_target = "Deny" if is_prev_positive else curr_node
+                self._add_edge(prev_node, "Yes", yes_target)
+                self._add_edge(prev_node, "No", no_target)
+
             if i == len(term) - 1:
-                yes_target = "Approve" if (lit.is_positive != is_negated) else "Deny"
-                no_target = "Deny" if (lit.is_positive != is_negated) else "Approve"
-                self.edges.add((curr_node, "Yes", yes_target))
-                self.edges.add((curr_node, "No", no_target))
-                
+                yes_target = "Approve" if lit.is_positive else "Deny"
+                no_target = "Deny" if lit.is_positive else "Approve"
+                self._add_edge(curr_node, "Yes", yes_target)
+                self._add_edge(curr_node, "No", no_target)
+
             prev_node = curr_node
             is_prev_positive = lit.is_positive
 
-def build_graph(data: Dict[str, str], use_dag: bool = False) -> str:
-    preprocessed, split_map = LogicPreprocessor().preprocess(data)
-    logic = preprocessed.get('logic', '')
-    questions = {k: v for k, v in preprocessed.items() if k != 'logic'}
-    
-    normalizer = NegationNormalizer()
-    node = ast.parse(logic, mode='eval').body
-    normalized_node = normalizer.normalize(node)
-    
+    def _add_edge(self, src: str, cond: str, tgt: str) -> None:
+        # First writer wins: a node has at most one Yes and one No edge.
+        # setdefault inserts and reads back in one lookup; a different existing
+        # target means two terms disagree, recorded for inspection
+        existing = self.out_edges.setdefault(src, {}).setdefault(cond, tgt)
+        if existing != tgt:
+            self.edge_conflicts.append((src, cond, tgt))
+
+def build_graph(data: Dict[str, str], use_dag: bool = False, verify: bool = False) -> str:
+    # The whole pipeline is deterministic in its inputs, so memoize end-to-end
+    key = (tuple(sorted(data.items())), use_dag, verify)
+    cached = _graph_cache.get(key)
+    if cached is not None:
+        _graph_cache.move_to_end(key)
+        return cached
+    result = _build_graph(data, use_dag, verify)
+    if _CACHE_SIZE > 0:
+        _graph_cache[key] = result
+        if len(_graph_cache) > _CACHE_SIZE:
+            _graph_cache.popitem(last=False)
+    return result
+
+_SIMPLE_AND_RE = re.compile(r'\s*\w+(?:\s+and\s+\w+)*\s*')
+_SIMPLE_OR_RE = re.compile(r'\s*\w+(?:\s+or\s+\w+)*\s*')
+
+def _valid_names(logic: str) -> Optional[List[str]]:
+    # Accept only tokens the parser would treat as plain variables; keywords
+    # and digit-leading tokens fall through to the full pipeline
+    names = logic.split()[::2]
+    if all(name.isidentifier() and not keyword.iskeyword(name) for name in names):
+        return names
+    return None
+
+def _trivial_terms(logic: str) -> Optional[List[Tuple[Literal, ...]]]:
+    # Cheap regex gate: a bare conjunction or disjunction of names needs no
+    # parser, preprocessor, NNF, or DNF machinery at all
+    if _SIMPLE_AND_RE.fullmatch(logic):
+        names = _valid_names(logic)
+        if names:
+            return [tuple(literal(name) for name in names)]
+    elif _SIMPLE_OR_RE.fullmatch(logic):
+        names = _valid_names(logic)
+        if names:
+            return [(literal(name),) for name in names]
+    return None
+
+_TREE_NODE_TYPES = frozenset({ast.BoolOp, ast.UnaryOp, ast.And, ast.Or, ast.Not, ast.Load})
+
+def _is_tree_shaped(node: ast.expr) -> bool:
+    # True when every variable appears at most once and only and/or/not are used,
+    # in which case the flowchart can be emitted straight from the AST
+    seen = set()
+    for sub in ast.walk(node):
+        if type(sub) is ast.Name:
+            if sub.id in seen:
+                return False
+            seen.add(sub.id)
+        elif type(sub) not in _TREE_NODE_TYPES:
+            return False
+    return True
+
+def compile_schema(questions: Dict[str, str]):
+    # Partially evaluate Mermaid emission for a fixed questions schema: the
+    # node-declaration lines are formatted once per schema and the returned
+    # closure only has to splice the per-logic edges
+    return _compile_schema(tuple(sorted(questions.items())))
+
+@functools.lru_cache(maxsize=1024)
+def _compile_schema(items: Tuple[Tuple[str, str], ...]):
+    questions = dict(items)
+    decls = {name: _NODE_FMT(name, text) for name, text in questions.items()}
+
+    def render(terms: List[Tuple[Literal, ...]], split_map: Dict[str, List[str]] = None) -> str:
+        builder = GraphBuilder(questions, split_map)
+        builder._populate_terms(terms)
+        return builder._emit_mermaid(decls)
+
+    return render
+
+def _simulate(builder: GraphBuilder, env: Dict[str, bool]) -> bool:
+    # Follow the chart under a full assignment; a multi-start chart approves
+    # when any Start branch reaches Approve
+    for name in builder.start_nodes:
+        steps = 0
+        while name not in ("Approve", "Deny"):
+            conds = builder.out_edges.get(name)
+            if conds is None:
+                raise ValueError(f"node {name} has no outgoing edges")
+            name = conds["Yes" if env[builder.nodes[name]] else "No"]
+            steps += 1
+            if steps > len(builder.nodes) + 1:
+                raise ValueError("cycle detected in emitted graph")
+        if name == "Approve":
+            return True
+    return False
+
+def _verify_graph(node: ast.expr, builder: GraphBuilder) -> None:
+    # Check the populated graph itself, not just the terms it came from:
+    # structural damage first (dropped conflicting edges, orphaned nodes),
+    # then every root-to-terminal verdict against the compiled expression
+    if builder.edge_conflicts:
+        raise ValueError(f"terms disagree on edges, dropped: {builder.edge_conflicts}")
+    reachable = set()
+    stack = list(builder.start_nodes)
+    while stack:
+        name = stack.pop()
+        if name in reachable or name in ("Approve", "Deny"):
+            continue
+        reachable.add(name)
+        stack.extend(builder.out_edges.get(name, {}).values())
+    unreachable = [name for name in builder.nodes if name not in reachable]
+    if unreachable:
+        raise ValueError(f"nodes unreachable from Start: {unreachable}")
+    names = sorted({sub.id for sub in ast.walk(node) if type(sub) is ast.Name})
+    if len(names) > 16:  # 2**16 simulations is the cap; bigger schemas keep the structural checks
+        return
+    compiled = compile(ast.fix_missing_locations(ast.Expression(body=node)), '<logic>', 'eval')
+    for values in product((False, True), repeat=len(names)):
+        env = dict(zip(names, values))
+        expected = bool(eval(compiled, {'__builtins__': {}}, dict(env)))
+        if _simulate(builder, env) != expected:
+            raise ValueError(f"graph disagrees with the logic expression under {env}")
+
+def _build_graph(data: Dict[str, str], use_dag: bool = False, verify: bool = False) -> str:
+    # verify never changes which path renders: it re-populates an identical
+    # builder and checks that graph, so --verify prints the same chart
+    terms = _trivial_terms(data.get('logic', ''))
+    if terms is not None:
+        questions = {**data}
+        questions.pop('logic', None)
+        if verify:
+            checker = GraphBuilder(questions)
+            checker._populate_terms(terms)
+            _verify_graph(_parse_logic(data.get('logic', '')), checker)
+        if use_dag:
+            return json.dumps(GraphBuilder(questions).build_dag(terms), separators=(',', ':'))
+        return compile_schema(questions)(terms)
+
+    node, questions, split_map = LogicPreprocessor().preprocess(data)
+
+    normalized_node = to_nnf(node)
+
+    builder = GraphBuilder(questions, split_map)
+    if _is_tree_shaped(normalized_node):
+        # Skip DNF expansion: direct emission is O(vars) instead of O(terms * depth)
+        if verify:
+            checker = GraphBuilder(questions, split_map)
+            checker._populate_ast(normalized_node)
+            _verify_graph(node, checker)
+        return json.dumps(builder.build_dag_from_ast(normalized_node), separators=(',', ':')) if use_dag else builder.build_mermaid_from_ast(normalized_node)
     terms = DNFConverter().convert(normalized_node)
-    builder = GraphBuilder(questions, split_map, normalizer.negated_nodes)
-    return json.dumps(builder.build_dag(terms), separators=(',', ':')) if use_dag else builder.build_mermaid(terms)
+    if verify:
+        checker = GraphBuilder(questions, split_map)
+        checker._populate_terms(terms)
+        _verify_graph(node, checker)
+    if use_dag:
+        return json.dumps(builder.build_dag(terms), separators=(',', ':'))
+    return compile_schema(questions)(terms, split_map)
 
 def main():
     default_data = {
@@ -249,10 +555,11 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('--data', type=str, help='JSON string containing questions and logic')
     parser.add_argument('--dag', action='store_true', help='Output as DAG JSON')
+    parser.add_argument('--verify', action='store_true', help='Check the emitted graph against the compiled logic')
     args = parser.parse_args()
-    
+
     data = json.loads(args.data) if args.data else default_data
-    print(build_graph(data, args.dag))
+    print(build_graph(data, args.dag, args.verify))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file